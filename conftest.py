@@ -0,0 +1,5 @@
+def pytest_configure(config):
+    """Use cheap password hashing for the test run."""
+    from django.conf import settings
+
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
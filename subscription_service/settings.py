@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     # Third-party
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
     'django_extensions',
     # Local apps
@@ -135,6 +137,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'subscriptions.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_THROTTLE_CLASSES': [
@@ -154,7 +160,16 @@ CACHES = {
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
         }
-    }
+    },
+    # Rate-limit counters live in their own Redis database so their
+    # increments do not compete with response cache entries
+    'ratelimit': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/2',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        }
+    },
 }
 
 LOGGING = {
@@ -190,4 +205,27 @@ LOGGING = {
 
 # Rate limiting configuration
 RATELIMIT_ENABLE = True
-RATELIMIT_USE_CACHE = 'default'
\ No newline at end of file
+RATELIMIT_USE_CACHE = 'ratelimit'
+
+# Error responses whose details exceed this many characters are summarized
+API_ERROR_DETAILS_MAX_SIZE = 10000
+
+
+# `manage.py test` speedups: cheap password hashing and no migrations
+# (pytest gets the same through pytest.ini and conftest.py)
+TESTING = sys.argv[1:2] == ['test']
+
+
+class DisableMigrations:
+    """Migration module mapping that makes the test runner skip migrations."""
+
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+if TESTING:
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    MIGRATION_MODULES = DisableMigrations()
@@ -16,11 +16,7 @@ class PlanAdmin(admin.ModelAdmin):
     list_filter = ('is_active', 'created_at')
     search_fields = ('name', 'description')
     filter_horizontal = ('features',)
-    readonly_fields = ('created_at', 'updated_at')
-    
-    def feature_count(self, obj):
-        return obj.features.count()
-    feature_count.short_description = 'Features'
+    readonly_fields = ('feature_count', 'created_at', 'updated_at')
 
 
 @admin.register(Subscription)
@@ -32,4 +28,6 @@ class SubscriptionAdmin(admin.ModelAdmin):
     raw_id_fields = ('user', 'plan')
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('user', 'plan')
+        return super().get_queryset(request)\
+                      .select_related('user', 'plan')\
+                      .prefetch_related('plan__features')
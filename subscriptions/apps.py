@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SubscriptionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'subscriptions'
+
+    def ready(self):
+        # Register cache invalidation signal handlers
+        from . import signals  # noqa: F401
@@ -1,5 +1,6 @@
 from decimal import Decimal
 from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
 from ..models import Feature, Plan, Subscription
 
@@ -37,16 +38,25 @@ class Command(BaseCommand):
             ('Multi-user Access', 'Team collaboration features'),
         ]
 
-        feature_objects = []
-        for name, description in features:
-            feature, created = Feature.objects.get_or_create(
-                name=name,
-                defaults={'description': description}
-            )
-            feature_objects.append(feature)
-            if created:
+        feature_names = [name for name, _ in features]
+        existing_features = set(
+            Feature.objects.filter(name__in=feature_names).values_list('name', flat=True)
+        )
+        Feature.objects.bulk_create(
+            [
+                Feature(name=name, description=description)
+                for name, description in features
+                if name not in existing_features
+            ],
+            ignore_conflicts=True,
+        )
+        for name in feature_names:
+            if name not in existing_features:
                 self.stdout.write(f'Created feature: {name}')
 
+        features_by_name = Feature.objects.in_bulk(feature_names, field_name='name')
+        feature_objects = [features_by_name[name] for name in feature_names]
+
         # Create plans
         self.stdout.write('Creating plans...')
         plans_data = [
@@ -76,23 +86,42 @@ class Command(BaseCommand):
             }
         ]
 
-        plan_objects = []
-        for plan_data in plans_data:
-            plan, created = Plan.objects.get_or_create(
-                name=plan_data['name'],
-                defaults={
-                    'description': plan_data['description'],
-                    'price': plan_data['price']
-                }
-            )
-            
-            # Add features to plan
-            plan.features.clear()
-            for feature_idx in plan_data['features']:
-                plan.features.add(feature_objects[feature_idx])
-            
-            plan_objects.append(plan)
-            if created:
+        plan_names = [plan_data['name'] for plan_data in plans_data]
+        existing_plans = set(
+            Plan.objects.filter(name__in=plan_names).values_list('name', flat=True)
+        )
+        Plan.objects.bulk_create(
+            [
+                Plan(
+                    name=plan_data['name'],
+                    description=plan_data['description'],
+                    price=plan_data['price'],
+                )
+                for plan_data in plans_data
+                if plan_data['name'] not in existing_plans
+            ],
+            ignore_conflicts=True,
+        )
+
+        plans_by_name = Plan.objects.in_bulk(plan_names, field_name='name')
+        plan_objects = [plans_by_name[name] for name in plan_names]
+
+        # Reset plan features in one DELETE + one INSERT
+        PlanFeature = Plan.features.through
+        PlanFeature.objects.filter(plan__in=plan_objects).delete()
+        PlanFeature.objects.bulk_create(
+            [
+                PlanFeature(plan_id=plan.id, feature_id=feature_objects[feature_idx].id)
+                for plan, plan_data in zip(plan_objects, plans_data)
+                for feature_idx in plan_data['features']
+            ],
+            ignore_conflicts=True,
+        )
+        # bulk_create bypasses m2m_changed, so refresh the denormalized counts
+        Plan.objects.refresh_feature_counts([plan.id for plan in plan_objects])
+
+        for plan in plan_objects:
+            if plan.name not in existing_plans:
                 self.stdout.write(f'Created plan: {plan.name} - ${plan.price}')
 
         # Create sample users
@@ -103,27 +132,46 @@ class Command(BaseCommand):
             ('bob_wilson', 'bob@example.com', 'Bob', 'Wilson'),
         ]
 
-        for username, email, first_name, last_name in users_data:
-            user, created = User.objects.get_or_create(
-                username=username,
-                defaults={
-                    'email': email,
-                    'first_name': first_name,
-                    'last_name': last_name,
-                }
-            )
-            if created:
-                user.set_password('testpass123')
-                user.save()
-                self.stdout.write(f'Created user: {username}')
-
-                # Create a subscription for each user (alternating plans)
-                plan_idx = len(User.objects.filter(username__in=[u[0] for u in users_data])) % len(plan_objects)
-                subscription = Subscription.objects.create(
-                    user=user,
-                    plan=plan_objects[plan_idx]
+        usernames = [u[0] for u in users_data]
+        existing_users = set(
+            User.objects.filter(username__in=usernames).values_list('username', flat=True)
+        )
+        password = make_password('testpass123')
+        User.objects.bulk_create(
+            [
+                User(
+                    username=username,
+                    email=email,
+                    first_name=first_name,
+                    last_name=last_name,
+                    password=password,
                 )
-                self.stdout.write(f'Created subscription for {username} with {plan_objects[plan_idx].name} plan')
+                for username, email, first_name, last_name in users_data
+                if username not in existing_users
+            ],
+            ignore_conflicts=True,
+        )
+        users_by_name = User.objects.in_bulk(usernames, field_name='username')
+        new_users = [
+            users_by_name[username] for username in usernames
+            if username not in existing_users
+        ]
+
+        # Create a subscription for each new user (alternating plans)
+        subscriptions = []
+        # Plan index is derived from a local counter, not a per-user COUNT query
+        plan_count = len(plan_objects)
+        for position, user in enumerate(new_users, start=len(existing_users) + 1):
+            self.stdout.write(f'Created user: {user.username}')
+            plan = plan_objects[position % plan_count]
+            subscriptions.append(Subscription(user=user, plan=plan))
+        Subscription.objects.bulk_create(subscriptions)
+
+        for subscription in subscriptions:
+            self.stdout.write(
+                f'Created subscription for {subscription.user.username} '
+                f'with {subscription.plan.name} plan'
+            )
 
         self.stdout.write(
             self.style.SUCCESS('Successfully created sample data!')
@@ -4,34 +4,56 @@ from django.utils.deprecation import MiddlewareMixin
 
 logger = logging.getLogger(__name__)
 
+# Path prefixes whose requests are logged
+_LOGGED_PREFIXES = ('/api/',)
+
+
+def get_request_username(request):
+    """Get the username for log lines, resolving request.user once per request."""
+    username = getattr(request, '_log_username', None)
+    if username is None:
+        username = getattr(getattr(request, 'user', None), 'username', 'Anonymous')
+        # Only pin real usernames; DRF may authenticate the user later on
+        if username:
+            request._log_username = username
+    return username
+
 
 class RequestLoggingMiddleware(MiddlewareMixin):
     """Middleware to log API requests and responses."""
     
     def process_request(self, request):
         """Log incoming request details."""
-        request.start_time = time.time()
+        # Skip non-API paths before touching request.user (lazy session load)
+        if not request.path.startswith(_LOGGED_PREFIXES):
+            return None
         
-        if request.path.startswith('/api/'):
-            logger.info(
-                f"API Request: {request.method} {request.path} "
-                f"- User: {getattr(request.user, 'username', 'Anonymous')} "
-                f"- IP: {self.get_client_ip(request)}"
-            )
+        request.start_time = time.monotonic()
+        logger.info(
+            "API Request: %s %s - User: %s - IP: %s",
+            request.method,
+            request.path,
+            get_request_username(request),
+            self.get_client_ip(request),
+        )
         
         return None
     
     def process_response(self, request, response):
         """Log response details and request duration."""
-        if hasattr(request, 'start_time') and request.path.startswith('/api/'):
-            duration = time.time() - request.start_time
-            
-            logger.info(
-                f"API Response: {request.method} {request.path} "
-                f"- Status: {response.status_code} "
-                f"- Duration: {duration:.3f}s "
-                f"- User: {getattr(request.user, 'username', 'Anonymous')}"
-            )
+        # start_time is only set for API paths
+        if not hasattr(request, 'start_time'):
+            return response
+        
+        duration = time.monotonic() - request.start_time
+        logger.info(
+            "API Response: %s %s - Status: %s - Duration: %.3fs - User: %s",
+            request.method,
+            request.path,
+            response.status_code,
+            duration,
+            get_request_username(request),
+        )
         
         return response
     
@@ -46,6 +68,7 @@ class RequestLoggingMiddleware(MiddlewareMixin):
 
 
 # exceptions.py
+from django.conf import settings
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
@@ -61,21 +84,28 @@ def custom_exception_handler(exc, context):
     if response is not None:
         # Log the exception
         request = context.get('request')
-        user = getattr(request, 'user', 'Anonymous')
         
         logger.error(
-            f"API Exception: {exc.__class__.__name__} "
-            f"- User: {getattr(user, 'username', 'Anonymous')} "
-            f"- Path: {getattr(request, 'path', 'Unknown')} "
-            f"- Method: {getattr(request, 'method', 'Unknown')} "
-            f"- Error: {str(exc)}"
+            "API Exception: %s - User: %s - Path: %s - Method: %s - Error: %s",
+            exc.__class__.__name__,
+            get_request_username(request),
+            getattr(request, 'path', 'Unknown'),
+            getattr(request, 'method', 'Unknown'),
+            exc,
         )
         
+        # Replace oversized error details (e.g. bulk validation errors)
+        # with a short summary instead of echoing them back
+        details = response.data
+        details_size = len(str(details))
+        if details_size > getattr(settings, 'API_ERROR_DETAILS_MAX_SIZE', 10000):
+            details = {'truncated': True, 'size': details_size}
+        
         # Customize error response format
         custom_response_data = {
             'error': True,
             'message': 'An error occurred',
-            'details': response.data,
+            'details': details,
             'status_code': response.status_code
         }
         
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-15 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['user', 'is_active', 'plan'], name='sub_user_active_plan_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='subscription',
+            name='subscriptio_user_id_123f65_idx',
+        ),
+    ]
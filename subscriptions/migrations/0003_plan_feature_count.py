@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-15 14:09
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_feature_count(apps, schema_editor):
+    Plan = apps.get_model('subscriptions', 'Plan')
+    for plan in Plan.objects.annotate(total=Count('features')).iterator():
+        Plan.objects.filter(pk=plan.pk).update(feature_count=plan.total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0002_subscription_user_active_plan_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plan',
+            name='feature_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of features in this plan, maintained by signals'),
+        ),
+        migrations.RunPython(populate_feature_count, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,14 @@
 import logging
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .utils import get_user_cached_entries
+
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +75,29 @@ class Feature(TimestampedModel):
         self.name = self.name.strip()
 
 
+class PlanManager(models.Manager):
+    """Custom manager for Plan model."""
+    
+    def refresh_feature_counts(self, plan_ids) -> int:
+        """
+        Recompute the denormalized feature_count for the given plans.
+        
+        Args:
+            plan_ids: Primary keys of the plans to refresh
+            
+        Returns:
+            int: Number of plans updated
+        """
+        through = self.model.features.through
+        feature_count = through.objects.filter(plan_id=models.OuterRef('pk'))\
+                                       .values('plan_id')\
+                                       .annotate(total=models.Count('pk'))\
+                                       .values('total')
+        return self.filter(pk__in=plan_ids).update(
+            feature_count=Coalesce(models.Subquery(feature_count), 0)
+        )
+
+
 class Plan(TimestampedModel):
     """
     Model representing a subscription plan with associated features.
@@ -106,6 +133,13 @@ class Plan(TimestampedModel):
         blank=True,
         help_text=_("Price of the plan (optional)")
     )
+    feature_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text=_("Number of features in this plan, maintained by signals")
+    )
+
+    objects = PlanManager()
 
     class Meta:
         ordering = ['name']
@@ -121,7 +155,7 @@ class Plan(TimestampedModel):
         """Return detailed string representation for debugging."""
         return (
             f"<Plan(id={self.id}, name='{self.name}', "
-            f"active={self.is_active}, features_count={self.features.count()})>"
+            f"active={self.is_active}, features_count={self.feature_count})>"
         )
 
     def clean(self) -> None:
@@ -153,12 +187,19 @@ class SubscriptionManager(models.Manager):
         Returns:
             Subscription instance or None if no active subscription exists
         """
-        try:
-            return self.select_related('plan', 'user')\
-                      .prefetch_related('plan__features')\
-                      .get(user=user, is_active=True)
-        except self.model.DoesNotExist:
-            return None
+        cache_key = f"active_subscription_obj_{user.id}"
+        version, cached = get_user_cached_entries(user.id, [cache_key])
+        subscription = cached.get(cache_key)
+        if subscription is not None:
+            # False is cached for users without an active subscription
+            return subscription or None
+        
+        subscription = self.select_related('plan', 'user')\
+                           .prefetch_related('plan__features')\
+                           .filter(user=user, is_active=True)\
+                           .first()
+        cache.set(cache_key, (version, subscription or False), timeout=60 * 5)
+        return subscription
 
     def get_optimized_queryset(self):
         """Return optimized queryset to avoid N+1 queries."""
@@ -212,9 +253,10 @@ class Subscription(TimestampedModel):
         verbose_name = _('Subscription')
         verbose_name_plural = _('Subscriptions')
         indexes = [
-            models.Index(fields=['user', 'is_active']),
             models.Index(fields=['plan', 'is_active']),
             models.Index(fields=['start_date']),
+            # Also serves (user, is_active) lookups as its leftmost prefix
+            models.Index(fields=['user', 'is_active', 'plan'], name='sub_user_active_plan_idx'),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -264,6 +306,7 @@ class Subscription(TimestampedModel):
         if notes:
             self.notes = f"{self.notes}\n{notes}".strip()
         
+        # post_save clears the user's caches
         self.save(update_fields=['is_active', 'end_date', 'notes', 'updated_at'])
         
         logger.info(
@@ -287,4 +330,11 @@ class Subscription(TimestampedModel):
         Returns:
             bool: True if the subscription includes the feature
         """
+        # Reuse prefetched features (e.g. from get_optimized_queryset) when available
+        if 'features' in getattr(self.plan, '_prefetched_objects_cache', {}):
+            return any(
+                feature.name == feature_name and feature.is_active
+                for feature in self.plan.features.all()
+            )
+        
         return self.plan.features.filter(name=feature_name, is_active=True).exists()
\ No newline at end of file
@@ -0,0 +1,28 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON renderer backed by orjson for faster response serialization."""
+
+    # Falls back to DRF's encoder for types orjson does not handle natively
+    # (Decimal, lazy translation strings, querysets, ...)
+    json_encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into JSON bytes."""
+        if data is None:
+            return b''
+
+        # orjson only indents by two spaces, so let DRF's renderer honour an
+        # explicit indent (browsable API, `; indent=N` in the Accept header)
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return orjson.dumps(
+            data,
+            default=self.json_encoder.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+        )
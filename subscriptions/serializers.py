@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from django.db import transaction
 from django.core.cache import cache
+from django.db import models, transaction
 import logging
 from .models import Feature, Plan, Subscription
+from .utils import get_versioned_entries
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
@@ -18,17 +19,12 @@ class FeatureSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
     def validate_name(self, value):
-        """Validate feature name is not empty and unique."""
+        """Validate feature name is not empty."""
+        # Uniqueness is covered by the UniqueValidator derived from the
+        # model's unique constraint, so no extra EXISTS query here
         if not value.strip():
             raise serializers.ValidationError("Feature name cannot be empty")
 
-        # Check uniqueness during update
-        if self.instance and self.instance.name != value:
-            if Feature.objects.filter(name=value).exists():
-                raise serializers.ValidationError(
-                    "Feature with this name already exists"
-                )
-
         return value.strip()
 
 
@@ -54,7 +50,8 @@ class PlanSerializer(serializers.ModelSerializer):
 
     def get_feature_count(self, obj):
         """Get count of active features in the plan."""
-        return obj.features.filter(is_active=True).count()
+        # Count over features.all() to reuse the prefetched features
+        return sum(1 for feature in obj.features.all() if feature.is_active)
 
     def validate_price(self, value):
         """Validate price is not negative."""
@@ -69,10 +66,101 @@ class PlanSerializer(serializers.ModelSerializer):
         return value.strip()
 
 
+# Base query for active plan-feature rows, built once at import; querysets are
+# lazy and each filter() call below clones it, so it is never evaluated here
+ACTIVE_PLAN_FEATURE_ROWS = (
+    Plan.features.through.objects.filter(feature__is_active=True)
+    .select_related("feature")
+    .only(
+        "plan_id",
+        "feature__id",
+        "feature__name",
+        "feature__description",
+        "feature__is_active",
+    )
+    .order_by("feature__name")
+)
+
+
+def get_plan_features_data(plan_ids):
+    """
+    Get serialized active features for the given plans, ordered by name.
+
+    Each plan's features are cached under ``plan_features_<plan_id>``,
+    stamped with the plan's cache version; the feature/plan signals drop the
+    version, so a load that raced them can never be served. Versions and
+    features are read in one round-trip, and all plans missing from the
+    cache are loaded together in one query.
+
+    Returns:
+        dict mapping plan id to a list of serialized features
+    """
+    cache_keys = {plan_id: f"plan_features_{plan_id}" for plan_id in plan_ids}
+    version_keys = {
+        plan_id: f"plan_features_version_{plan_id}" for plan_id in plan_ids
+    }
+    versions, cached = get_versioned_entries(
+        {version_keys[plan_id]: [cache_keys[plan_id]] for plan_id in plan_ids}
+    )
+    plan_features = {
+        plan_id: cached[cache_key]
+        for plan_id, cache_key in cache_keys.items()
+        if cache_key in cached
+    }
+
+    missing = [plan_id for plan_id in cache_keys if plan_id not in plan_features]
+    if missing:
+        loaded = {plan_id: [] for plan_id in missing}
+        plan_feature_rows = ACTIVE_PLAN_FEATURE_ROWS.filter(plan_id__in=missing)
+        for row in plan_feature_rows:
+            loaded[row.plan_id].append(dict(FeatureSerializer(row.feature).data))
+
+        cache.set_many(
+            {
+                cache_keys[plan_id]: (versions[version_keys[plan_id]], features)
+                for plan_id, features in loaded.items()
+            },
+            timeout=60 * 15,
+        )  # Cache for 15 minutes
+        plan_features.update(loaded)
+
+    return plan_features
+
+
+class SubscriptionPlanSerializer(PlanSerializer):
+    """Plan serializer for subscriptions, reading active features from the cache."""
+
+    features = serializers.SerializerMethodField()
+
+    def get_features(self, obj):
+        """Get the plan's active features, loading them once per serialization."""
+        plan_features = self.context.setdefault("plan_features", {})
+        if obj.id not in plan_features:
+            plan_features.update(get_plan_features_data([obj.id]))
+        return plan_features[obj.id]
+
+    def get_feature_count(self, obj):
+        """Get count of active features in the plan."""
+        return len(self.get_features(obj))
+
+
+class SubscriptionBatchSerializer(serializers.ListSerializer):
+    """List serializer that loads plan features for all subscriptions at once."""
+
+    def to_representation(self, data):
+        """Preload cached plan features before serializing each subscription."""
+        iterable = list(data.all() if isinstance(data, models.Manager) else data)
+        plan_ids = {subscription.plan_id for subscription in iterable}
+        self.context.setdefault("plan_features", {}).update(
+            get_plan_features_data(plan_ids)
+        )
+        return super().to_representation(iterable)
+
+
 class SubscriptionListSerializer(serializers.ModelSerializer):
     """Serializer for listing subscriptions with nested plan and feature data."""
 
-    plan = PlanSerializer(read_only=True)
+    plan = SubscriptionPlanSerializer(read_only=True)
     user_email = serializers.EmailField(source="user.email", read_only=True)
     duration_days = serializers.SerializerMethodField()
 
@@ -89,6 +177,7 @@ class SubscriptionListSerializer(serializers.ModelSerializer):
             "created_at",
         ]
         read_only_fields = ["id", "start_date", "created_at"]
+        list_serializer_class = SubscriptionBatchSerializer
 
     def get_duration_days(self, obj):
         """Calculate subscription duration in days."""
@@ -114,16 +203,19 @@ class SubscriptionCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """Create new subscription, deactivating any existing active subscription."""
         user = self.context["request"].user
-        plan = validated_data["plan"]
 
-        # Deactivate existing active subscription
-        existing_subscription = Subscription.objects.filter(
-            user=user, is_active=True
-        ).first()
+        # Lock the user row so concurrent creates for the same user run one
+        # after another instead of racing on the active-subscription constraint
+        User.objects.select_for_update().filter(pk=user.pk).exists()
 
-        if existing_subscription:
-            existing_subscription.deactivate()
-            logger.info(f"Deactivated existing subscription {existing_subscription.id}")
+        # Deactivate existing active subscription in a single UPDATE
+        now = timezone.now()
+        deactivated = Subscription.objects.filter(user=user, is_active=True).update(
+            is_active=False, end_date=now, updated_at=now
+        )
+
+        if deactivated:
+            logger.info(f"Deactivated existing subscription for user {user.username}")
 
         # Create new subscription
         subscription = Subscription.objects.create(user=user, **validated_data)
@@ -131,9 +223,7 @@ class SubscriptionCreateSerializer(serializers.ModelSerializer):
             f"Created new subscription {subscription.id} for user {user.username}"
         )
 
-        # Clear user's subscription cache
-        cache.delete(f"user_subscriptions_{user.id}")
-
+        # post_save on the new subscription clears the user's caches
         return subscription
 
 
@@ -165,7 +255,5 @@ class SubscriptionUpdateSerializer(serializers.ModelSerializer):
             f"Updated subscription {instance.id} from {old_plan} to {instance.plan.name}"
         )
 
-        # Clear user's subscription cache
-        cache.delete(f"user_subscriptions_{instance.user.id}")
-
+        # post_save on the subscription clears the user's caches
         return instance
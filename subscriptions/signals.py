@@ -1,8 +1,10 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.core.cache import cache
 from django.contrib.auth.models import User
+from django.db import transaction
 from .models import Subscription, Plan, Feature
+from .utils import invalidate_user_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,9 +13,10 @@ logger = logging.getLogger(__name__)
 @receiver(post_save, sender=Subscription)
 def subscription_post_save(sender, instance, created, **kwargs):
     """Clear cache when subscription is saved."""
-    # Clear user's subscription cache
-    cache.delete(f"user_subscriptions_{instance.user.id}")
-    cache.delete(f"active_subscription_{instance.user.id}")
+    # Clear user's subscription cache once the change is visible to readers;
+    # clearing earlier lets a concurrent read re-cache the pre-commit rows
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_user_cache(user_id))
     
     if created:
         logger.info(f"New subscription created: {instance.id} for user {instance.user.username}")
@@ -24,8 +27,8 @@ def subscription_post_save(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=Subscription)
 def subscription_post_delete(sender, instance, **kwargs):
     """Clear cache when subscription is deleted."""
-    cache.delete(f"user_subscriptions_{instance.user.id}")
-    cache.delete(f"active_subscription_{instance.user.id}")
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_user_cache(user_id))
     logger.info(f"Subscription deleted: {instance.id}")
 
 
@@ -39,16 +42,60 @@ def plan_post_save(sender, instance, **kwargs):
     logger.info(f"Plan cache cleared for: {instance.name}")
 
 
+def invalidate_plan_subscriber_caches(plan_ids):
+    """Clear the plans' cached features and the caches of their subscribers."""
+    user_ids = Subscription.objects.filter(plan_id__in=plan_ids)\
+                                   .values_list('user_id', flat=True)\
+                                   .distinct()
+    # One batched delete; dropping a plan's or user's version key
+    # invalidates everything cached under it
+    cache_keys = [f"plan_features_version_{plan_id}" for plan_id in plan_ids]
+    cache_keys.extend(f"user_cache_version_{user_id}" for user_id in user_ids)
+    transaction.on_commit(lambda: cache.delete_many(cache_keys))
+
+
 @receiver(post_save, sender=Feature)
 def feature_post_save(sender, instance, **kwargs):
     """Clear related caches when feature is updated."""
-    # Clear all plan caches since features might be linked to plans
+    # Clear all plan caches since features might be linked to plans,
+    # plus the feature lists of its plans and the caches of affected users
     cache.delete("plans_list")
-    
-    # Clear subscription caches for plans that have this feature
-    for plan in instance.plans.all():
-        for subscription in plan.subscriptions.all():
-            cache.delete(f"user_subscriptions_{subscription.user.id}")
-            cache.delete(f"active_subscription_{subscription.user.id}")
+    invalidate_plan_subscriber_caches(list(instance.plans.values_list('id', flat=True)))
     
     logger.info(f"Feature cache cleared for: {instance.name}")
+
+
+@receiver(m2m_changed, sender=Plan.features.through)
+def plan_features_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep Plan.feature_count and plan-related caches in sync."""
+    if reverse and action == 'pre_clear':
+        # pk_set is not provided on clear, so remember the affected plans
+        instance._cleared_plan_ids = list(instance.plans.values_list('id', flat=True))
+        return
+    
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    
+    if not reverse:
+        plan_ids = [instance.pk]
+    elif action == 'post_clear':
+        plan_ids = getattr(instance, '_cleared_plan_ids', [])
+    else:
+        plan_ids = pk_set
+    
+    Plan.objects.refresh_feature_counts(plan_ids)
+    invalidate_plan_subscriber_caches(plan_ids)
+
+
+@receiver(pre_delete, sender=Feature)
+def feature_pre_delete(sender, instance, **kwargs):
+    """Remember the plans of a feature so their counts can be refreshed."""
+    instance._deleted_plan_ids = list(instance.plans.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Feature)
+def feature_post_delete(sender, instance, **kwargs):
+    """Refresh feature counts and caches of plans that lost the feature."""
+    plan_ids = getattr(instance, '_deleted_plan_ids', [])
+    Plan.objects.refresh_feature_counts(plan_ids)
+    invalidate_plan_subscriber_caches(plan_ids)
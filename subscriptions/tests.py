@@ -1,74 +1,111 @@
 import json
-from django.test import TestCase
+from unittest import mock
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
-from django.urls import reverse
+from django.urls import resolve, reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
-from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from django.core.cache import caches
 from decimal import Decimal
 from .models import Feature, Plan, Subscription
+from .serializers import get_plan_features_data
+from .views import SubscriptionViewSet
 
 
+# In-process cache so view and signal cache traffic never leaves the test run
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'subscriptions-tests',
+    },
+    'ratelimit': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'subscriptions-tests-ratelimit',
+    },
+}
 
+
+@override_settings(CACHES=LOCMEM_CACHES)
 class SubscriptionAPITestCase(APITestCase):
     """Test cases for Subscription API."""
     
-    def setUp(self):
-        """Set up test data."""
-        # cache.clear()  # Clear cache before each test
-        
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by all tests in the class."""
         # Create test users
-        self.user1 = User.objects.create_user(
+        cls.user1 = User.objects.create_user(
             username='testuser1',
             email='test1@example.com',
             password='testpass123'
         )
-        self.user2 = User.objects.create_user(
+        cls.user2 = User.objects.create_user(
             username='testuser2', 
             email='test2@example.com',
             password='testpass123'
         )
         
         # Create features
-        self.feature1 = Feature.objects.create(
-            name='Unlimited API Access',
-            description='Access to unlimited API calls'
-        )
-        self.feature2 = Feature.objects.create(
-            name='Priority Support',
-            description='24/7 priority customer support'
-        )
-        self.feature3 = Feature.objects.create(
-            name='Advanced Analytics',
-            description='Advanced analytics and reporting'
-        )
-        
-        # Create plans
-        self.basic_plan = Plan.objects.create(
-            name='Basic Plan',
-            description='Basic features for small teams',
-            price=Decimal('19.99')
-        )
-        self.basic_plan.features.add(self.feature1)
-        
-        self.pro_plan = Plan.objects.create(
-            name='Pro Plan',
-            description='Advanced features for growing teams',
-            price=Decimal('49.99')
-        )
-        self.pro_plan.features.add(self.feature1, self.feature2, self.feature3)
+        cls.feature1, cls.feature2, cls.feature3 = Feature.objects.bulk_create([
+            Feature(
+                name='Unlimited API Access',
+                description='Access to unlimited API calls'
+            ),
+            Feature(
+                name='Priority Support',
+                description='24/7 priority customer support'
+            ),
+            Feature(
+                name='Advanced Analytics',
+                description='Advanced analytics and reporting'
+            ),
+        ])
+        
+        # Create plans; the inactive plan must exist in the DB for the plan
+        # lookup to reach the active check
+        cls.basic_plan, cls.pro_plan, cls.inactive_plan = Plan.objects.bulk_create([
+            Plan(
+                name='Basic Plan',
+                description='Basic features for small teams',
+                price=Decimal('19.99')
+            ),
+            Plan(
+                name='Pro Plan',
+                description='Advanced features for growing teams',
+                price=Decimal('49.99')
+            ),
+            Plan(
+                name='Inactive Plan',
+                price=Decimal('29.99'),
+                is_active=False
+            ),
+        ])
+        cls.basic_plan.features.add(cls.feature1)
+        cls.pro_plan.features.add(cls.feature1, cls.feature2, cls.feature3)
+        
+        # Reusable client authenticated as user1
+        cls.auth_client_user1 = APIClient()
+        cls.auth_client_user1.force_authenticate(user=cls.user1)
+        
+        # Token header for tests that go through real token authentication
+        token = Token.objects.create(user=cls.user1)
+        cls.user1_auth_header = {'HTTP_AUTHORIZATION': f'Token {token.key}'}
+    
+    def setUp(self):
+        """Set up per-test state."""
+        # Clear the response and rate-limit caches before each test
+        for test_cache in caches.all():
+            test_cache.clear()
         
         # Set up API client
         self.client = APIClient()
     
     def test_subscription_creation(self):
         """Test creating a new subscription."""
-        self.client.force_authenticate(user=self.user1)
-        
         url = reverse('subscription-list')
         data = {'plan': self.basic_plan.id}
         
-        response = self.client.post(url, data, format='json')
+        response = self.auth_client_user1.post(url, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Subscription.objects.filter(user=self.user1).count(), 1)
@@ -79,8 +116,6 @@ class SubscriptionAPITestCase(APITestCase):
     
     def test_subscription_creation_deactivates_existing(self):
         """Test that creating a new subscription deactivates existing active one."""
-        self.client.force_authenticate(user=self.user1)
-        
         # Create first subscription
         first_subscription = Subscription.objects.create(
             user=self.user1,
@@ -90,7 +125,7 @@ class SubscriptionAPITestCase(APITestCase):
         url = reverse('subscription-list')
         data = {'plan': self.pro_plan.id}
         
-        response = self.client.post(url, data, format='json')
+        response = self.auth_client_user1.post(url, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         
@@ -107,8 +142,6 @@ class SubscriptionAPITestCase(APITestCase):
     
     def test_list_user_subscriptions(self):
         """Test listing user's subscriptions with nested data."""
-        self.client.force_authenticate(user=self.user1)
-        
         # Create subscriptions
         subscription = Subscription.objects.create(
             user=self.user1,
@@ -116,15 +149,16 @@ class SubscriptionAPITestCase(APITestCase):
         )
         
         url = reverse('subscription-list')
-        response = self.client.get(url)
+        response = self.auth_client_user1.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['count'], 1)
         
         sub_data = response.data['results'][0]
         self.assertEqual(sub_data['id'], subscription.id)
         self.assertEqual(sub_data['plan']['name'], 'Pro Plan')
         self.assertEqual(len(sub_data['plan']['features']), 3)
+        self.assertEqual(sub_data['plan']['feature_count'], 3)
         
         # Check feature details
         feature_names = [f['name'] for f in sub_data['plan']['features']]
@@ -132,10 +166,100 @@ class SubscriptionAPITestCase(APITestCase):
         self.assertIn('Priority Support', feature_names)
         self.assertIn('Advanced Analytics', feature_names)
     
+    def test_list_summary_returns_count_only(self):
+        """Test ?summary=1 returns the subscription count without results."""
+        Subscription.objects.create(user=self.user1, plan=self.pro_plan)
+        url = reverse('subscription-list')
+        
+        response = self.auth_client_user1.get(url, {'summary': 1})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'count': 1})
+    
+    def test_list_cache_invalidated_on_subscription_change(self):
+        """Test cached subscription lists are refreshed after a new subscription."""
+        Subscription.objects.create(user=self.user1, plan=self.basic_plan)
+        url = reverse('subscription-list')
+        
+        response = self.auth_client_user1.get(url)
+        self.assertEqual(response.data['count'], 1)
+        response = self.auth_client_user1.get(url, {'page_size': 1})
+        self.assertEqual(response.data['count'], 1)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.auth_client_user1.post(url, {'plan': self.pro_plan.id}, format='json')
+        
+        response = self.auth_client_user1.get(url)
+        self.assertEqual(response.data['count'], 2)
+        response = self.auth_client_user1.get(url, {'page_size': 1})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(len(response.data['results']), 1)
+    
+    def test_list_cache_ignores_unused_query_params(self):
+        """Test query params the list view does not use share one cached page."""
+        Subscription.objects.create(user=self.user1, plan=self.basic_plan)
+        url = reverse('subscription-list')
+        self.auth_client_user1.get(url)
+        
+        with self.assertNumQueries(0):
+            response = self.auth_client_user1.get(url, {'junk': 1, 'page': 1})
+        self.assertEqual(response.data['count'], 1)
+    
+    def test_cached_plan_features_refresh_on_feature_change(self):
+        """Test nested plan features reflect feature and plan changes."""
+        Subscription.objects.create(user=self.user1, plan=self.pro_plan)
+        url = reverse('subscription-active-subscription')
+        
+        response = self.auth_client_user1.get(url)
+        self.assertEqual(response.data['plan']['feature_count'], 3)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.feature2.is_active = False
+            self.feature2.save()
+        
+        response = self.auth_client_user1.get(url)
+        self.assertEqual(response.data['plan']['feature_count'], 2)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pro_plan.features.remove(self.feature3)
+        
+        response = self.auth_client_user1.get(url)
+        feature_names = [f['name'] for f in response.data['plan']['features']]
+        self.assertEqual(feature_names, ['Unlimited API Access'])
+    
+    def test_stale_plan_features_write_is_ignored(self):
+        """Test plan features cached by a load that raced an invalidation are not served."""
+        cache_key = f"plan_features_{self.pro_plan.id}"
+        get_plan_features_data([self.pro_plan.id])
+        stale_entry = caches['default'].get(cache_key)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pro_plan.features.remove(self.feature3)
+        # A loader that read the old rows writes them back after the invalidation
+        caches['default'].set(cache_key, stale_entry)
+        
+        features = get_plan_features_data([self.pro_plan.id])[self.pro_plan.id]
+        self.assertEqual(len(features), 2)
+    
+    def test_cached_subscriptions_refresh_on_feature_delete(self):
+        """Test deleting a feature drops it from cached list and active responses."""
+        Subscription.objects.create(user=self.user1, plan=self.pro_plan)
+        list_url = reverse('subscription-list')
+        active_url = reverse('subscription-active-subscription')
+        self.auth_client_user1.get(list_url)
+        self.auth_client_user1.get(active_url)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.feature3.delete()
+        
+        response = self.auth_client_user1.get(list_url)
+        self.assertEqual(response.data['results'][0]['plan']['feature_count'], 2)
+        response = self.auth_client_user1.get(active_url)
+        feature_names = [f['name'] for f in response.data['plan']['features']]
+        self.assertNotIn('Advanced Analytics', feature_names)
+    
     def test_change_subscription_plan(self):
         """Test changing a user's subscription plan."""
-        self.client.force_authenticate(user=self.user1)
-        
         subscription = Subscription.objects.create(
             user=self.user1,
             plan=self.basic_plan
@@ -144,7 +268,7 @@ class SubscriptionAPITestCase(APITestCase):
         url = reverse('subscription-change-plan', args=[subscription.id])
         data = {'plan': self.pro_plan.id}
         
-        response = self.client.put(url, data, format='json')
+        response = self.auth_client_user1.put(url, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
@@ -153,18 +277,17 @@ class SubscriptionAPITestCase(APITestCase):
         
         # Check response includes updated plan data
         self.assertEqual(response.data['plan']['name'], 'Pro Plan')
+        self.assertEqual(len(response.data['plan']['features']), 3)
     
     def test_deactivate_subscription(self):
         """Test deactivating a subscription."""
-        self.client.force_authenticate(user=self.user1)
-        
         subscription = Subscription.objects.create(
             user=self.user1,
             plan=self.basic_plan
         )
         
         url = reverse('subscription-deactivate', args=[subscription.id])
-        response = self.client.post(url)
+        response = self.auth_client_user1.post(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
@@ -180,12 +303,9 @@ class SubscriptionAPITestCase(APITestCase):
             plan=self.basic_plan
         )
         
-        # Authenticate as user1
-        self.client.force_authenticate(user=self.user1)
-        
-        # Try to access user2's subscription
+        # Try to access user2's subscription as user1
         url = reverse('subscription-detail', args=[subscription.id])
-        response = self.client.get(url)
+        response = self.auth_client_user1.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
     
@@ -195,70 +315,143 @@ class SubscriptionAPITestCase(APITestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_authentication(self):
+        """Test requests carrying user1's token header are authenticated."""
+        subscription = Subscription.objects.create(user=self.user1, plan=self.basic_plan)
+        url = reverse('subscription-active-subscription')
+        
+        response = self.client.get(url, **self.user1_auth_header)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], subscription.id)
+    
+    def test_url_names_resolve_under_api_v1(self):
+        """Test every named route is served once under the api/v1/ prefix."""
+        self.assertEqual(reverse('subscription-list'), '/api/v1/subscriptions/')
+        self.assertEqual(reverse('subscription-active-subscription'), '/api/v1/subscriptions/active/')
+        self.assertEqual(reverse('subscription-detail', args=[1]), '/api/v1/subscriptions/1/')
+        self.assertEqual(
+            reverse('subscription-change-plan', args=[1]),
+            '/api/v1/subscriptions/1/change-plan/'
+        )
+        self.assertEqual(
+            reverse('subscription-deactivate', args=[1]),
+            '/api/v1/subscriptions/1/deactivate/'
+        )
+        self.assertEqual(reverse('plan-list'), '/api/v1/plans/')
+        self.assertEqual(reverse('plan-detail', args=[1]), '/api/v1/plans/1/')
+
+    def test_viewset_routes_support_reverse_action(self):
+        """Test explicit routes pass the router's initkwargs to the viewset."""
+        view = resolve(reverse('subscription-list')).func
+        viewset = SubscriptionViewSet(**view.initkwargs)
+        viewset.request = None
+        
+        self.assertEqual(viewset.basename, 'subscription')
+        self.assertFalse(viewset.detail)
+        self.assertEqual(
+            viewset.reverse_action('deactivate', args=[1]),
+            '/api/v1/subscriptions/1/deactivate/'
+        )
     
     def test_invalid_plan_validation(self):
         """Test validation for invalid plan."""
-        self.client.force_authenticate(user=self.user1)
-        
-        # Create inactive plan
-        inactive_plan = Plan.objects.create(
-            name='Inactive Plan',
-            price=Decimal('29.99'),
-            is_active=False
-        )
-        
         url = reverse('subscription-list')
-        data = {'plan': inactive_plan.id}
+        data = {'plan': self.inactive_plan.id}
         
-        response = self.client.post(url, data, format='json')
+        response = self.auth_client_user1.post(url, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('Cannot subscribe to inactive plan', str(response.data))
     
     def test_get_active_subscription(self):
         """Test getting user's active subscription."""
-        self.client.force_authenticate(user=self.user1)
-        
         subscription = Subscription.objects.create(
             user=self.user1,
             plan=self.pro_plan
         )
         
         url = reverse('subscription-active-subscription')
-        response = self.client.get(url)
+        response = self.auth_client_user1.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['id'], subscription.id)
         self.assertEqual(response.data['plan']['name'], 'Pro Plan')
     
+    def test_active_subscription_served_from_cached_list(self):
+        """Test the active endpoint reuses a cached subscription list."""
+        subscription = Subscription.objects.create(
+            user=self.user1,
+            plan=self.pro_plan
+        )
+        self.auth_client_user1.get(reverse('subscription-list'))
+        
+        with self.assertNumQueries(0):
+            response = self.auth_client_user1.get(reverse('subscription-active-subscription'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], subscription.id)
+    
+    def test_warm_active_subscription_reads_cache_once(self):
+        """Test a warm active lookup fetches its version and data in one get_many."""
+        Subscription.objects.create(user=self.user1, plan=self.pro_plan)
+        url = reverse('subscription-active-subscription')
+        self.auth_client_user1.get(url)
+        
+        default_cache = caches['default']
+        with mock.patch.object(default_cache, 'get_many', wraps=default_cache.get_many) as get_many, \
+                mock.patch.object(default_cache, 'add', wraps=default_cache.add) as add:
+            response = self.auth_client_user1.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_many.call_count, 1)
+        add.assert_not_called()
+    
     def test_no_active_subscription(self):
         """Test response when user has no active subscription."""
-        self.client.force_authenticate(user=self.user1)
-        
         url = reverse('subscription-active-subscription')
-        response = self.client.get(url)
+        response = self.auth_client_user1.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertIn('No active subscription found', response.data['message'])
+        
+        # The negative lookup is cached until a subscription is created
+        with self.assertNumQueries(0):
+            response = self.auth_client_user1.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Subscription.objects.create(user=self.user1, plan=self.basic_plan)
+        response = self.auth_client_user1.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
+@override_settings(CACHES=LOCMEM_CACHES)
 class SubscriptionModelTestCase(TestCase):
     """Test cases for Subscription model."""
     
-    def setUp(self):
-        """Set up test data."""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data shared by all tests in the class."""
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
         
-        self.feature = Feature.objects.create(name='Test Feature')
-        self.plan = Plan.objects.create(
+        cls.feature = Feature.objects.create(name='Test Feature')
+        cls.plan = Plan.objects.create(
             name='Test Plan',
             price=Decimal('19.99')
         )
-        self.plan.features.add(self.feature)
+        cls.plan.features.add(cls.feature)
+    
+    def setUp(self):
+        """Set up per-test state."""
+        # Clear the response and rate-limit caches before each test
+        for test_cache in caches.all():
+            test_cache.clear()
     
     def test_subscription_deactivate_method(self):
         """Test subscription deactivate method."""
@@ -273,4 +466,54 @@ class SubscriptionModelTestCase(TestCase):
         subscription.deactivate()
         
         self.assertFalse(subscription.is_active)
-        self.assertIsNotNone(subscription.end_date)
\ No newline at end of file
+        self.assertIsNotNone(subscription.end_date)
+    
+    def test_subscription_has_feature_uses_prefetched_features(self):
+        """Test has_feature answers from prefetched features without queries."""
+        Subscription.objects.create(user=self.user, plan=self.plan)
+        subscription = Subscription.objects.get_optimized_queryset().get(user=self.user)
+        
+        with self.assertNumQueries(0):
+            self.assertTrue(subscription.has_feature('Test Feature'))
+            self.assertFalse(subscription.has_feature('Missing Feature'))
+        
+        # Falls back to a query when features are not prefetched
+        subscription = Subscription.objects.get(user=self.user)
+        self.assertTrue(subscription.has_feature('Test Feature'))
+    
+    def test_get_active_subscription_for_user_is_cached(self):
+        """Test active subscription lookups are served from cache until invalidated."""
+        subscription = Subscription.objects.create(user=self.user, plan=self.plan)
+        
+        self.assertEqual(
+            Subscription.objects.get_active_subscription_for_user(self.user),
+            subscription
+        )
+        with self.assertNumQueries(0):
+            cached = Subscription.objects.get_active_subscription_for_user(self.user)
+        self.assertEqual(cached, subscription)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            subscription.deactivate()
+        
+        self.assertIsNone(Subscription.objects.get_active_subscription_for_user(self.user))
+        with self.assertNumQueries(0):
+            self.assertIsNone(Subscription.objects.get_active_subscription_for_user(self.user))
+    
+    def test_plan_feature_count_tracks_feature_changes(self):
+        """Test the denormalized feature count follows M2M changes."""
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.feature_count, 1)
+        
+        other_feature = Feature.objects.create(name='Other Feature')
+        other_feature.plans.add(self.plan)
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.feature_count, 2)
+        
+        self.plan.features.remove(self.feature)
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.feature_count, 1)
+        
+        other_feature.delete()
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.feature_count, 0)
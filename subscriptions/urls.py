@@ -1,11 +1,51 @@
-from django.urls import path, include
-from rest_framework.routers import DefaultRouter
+from django.urls import path
 from .views import SubscriptionViewSet, PlanViewSet
 
-router = DefaultRouter()
-router.register(r'subscriptions', SubscriptionViewSet, basename='subscription')
-router.register(r'plans', PlanViewSet, basename='plan')
+# Explicit routes instead of a DefaultRouter: no API root view and no
+# format-suffix patterns for the resolver to scan on every request.
+# Each view gets the initkwargs the router would pass (basename, detail,
+# suffix or the action's name) so reverse_action() and the browsable API
+# keep working.
+subscription_list = SubscriptionViewSet.as_view(
+    {'get': 'list', 'post': 'create'},
+    basename='subscription', detail=False, suffix='List',
+)
+subscription_detail = SubscriptionViewSet.as_view(
+    {
+        'get': 'retrieve',
+        'put': 'update',
+        'patch': 'partial_update',
+        'delete': 'destroy',
+    },
+    basename='subscription', detail=True, suffix='Instance',
+)
+subscription_change_plan = SubscriptionViewSet.as_view(
+    {'put': 'change_plan'},
+    basename='subscription', detail=True, **SubscriptionViewSet.change_plan.kwargs,
+)
+subscription_deactivate = SubscriptionViewSet.as_view(
+    {'post': 'deactivate'},
+    basename='subscription', detail=True, **SubscriptionViewSet.deactivate.kwargs,
+)
+subscription_active = SubscriptionViewSet.as_view(
+    {'get': 'active_subscription'},
+    basename='subscription', detail=False, **SubscriptionViewSet.active_subscription.kwargs,
+)
+plan_list = PlanViewSet.as_view(
+    {'get': 'list'},
+    basename='plan', detail=False, suffix='List',
+)
+plan_detail = PlanViewSet.as_view(
+    {'get': 'retrieve'},
+    basename='plan', detail=True, suffix='Instance',
+)
 
 urlpatterns = [
-    path('', include(router.urls)),
-]
\ No newline at end of file
+    path('subscriptions/', subscription_list, name='subscription-list'),
+    path('subscriptions/active/', subscription_active, name='subscription-active-subscription'),
+    path('subscriptions/<int:pk>/', subscription_detail, name='subscription-detail'),
+    path('subscriptions/<int:pk>/change-plan/', subscription_change_plan, name='subscription-change-plan'),
+    path('subscriptions/<int:pk>/deactivate/', subscription_deactivate, name='subscription-deactivate'),
+    path('plans/', plan_list, name='plan-list'),
+    path('plans/<int:pk>/', plan_detail, name='plan-detail'),
+]
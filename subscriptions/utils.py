@@ -2,7 +2,11 @@ from django.core.cache import cache
 from django.db.models import QuerySet
 from typing import Any, Optional
 import hashlib
-import json
+import time
+from itertools import chain
+
+# Keys longer than this are hashed (memcached rejects keys over 250 bytes)
+MAX_CACHE_KEY_LENGTH = 200
 
 
 def get_cache_key(prefix: str, *args, **kwargs) -> str:
@@ -16,14 +20,15 @@ def get_cache_key(prefix: str, *args, **kwargs) -> str:
         else:
             key_parts.append(str(hash(str(arg))))
     
-    # Add keyword arguments
-    if kwargs:
-        sorted_kwargs = sorted(kwargs.items())
-        kwargs_str = json.dumps(sorted_kwargs, sort_keys=True)
-        kwargs_hash = hashlib.md5(kwargs_str.encode()).hexdigest()[:8]
-        key_parts.append(kwargs_hash)
+    # Add keyword arguments as plain key=value pairs
+    key_parts.extend(f"{key}={value}" for key, value in sorted(kwargs.items()))
+    
+    cache_key = "_".join(key_parts)
+    if len(cache_key) > MAX_CACHE_KEY_LENGTH:
+        digest = hashlib.blake2b(cache_key.encode(), digest_size=8).hexdigest()
+        cache_key = f"{prefix}_{digest}"
     
-    return "_".join(key_parts)
+    return cache_key
 
 
 def cached_queryset(cache_key: str, queryset_func, timeout: int = 300) -> QuerySet:
@@ -37,10 +42,62 @@ def cached_queryset(cache_key: str, queryset_func, timeout: int = 300) -> QueryS
     return data
 
 
+def start_cache_version(version_key: str) -> int:
+    """Start a new cache version, or return the one another request just started."""
+    # Start from a timestamp so a dropped version is never reused
+    version = time.time_ns()
+    if not cache.add(version_key, version, timeout=None):
+        version = cache.get(version_key, version)
+    return version
+
+
+def get_versioned_entries(keys_by_version_key: dict) -> tuple:
+    """
+    Fetch versioned cache entries and their versions in a single round-trip.
+    
+    Entries are cached as ``(version, value)`` pairs. Invalidation moves the
+    version on instead of deleting entries, so an entry written under an
+    older version (e.g. by a request that raced the invalidation) is ignored.
+    
+    Args:
+        keys_by_version_key: maps each version key to the entry keys under it
+        
+    Returns:
+        tuple of (current version per version key, valid values by entry key)
+    """
+    cached = cache.get_many([
+        *keys_by_version_key,
+        *chain.from_iterable(keys_by_version_key.values()),
+    ])
+    versions = {}
+    entries = {}
+    for version_key, keys in keys_by_version_key.items():
+        version = cached.get(version_key)
+        if version is None:
+            version = start_cache_version(version_key)
+        versions[version_key] = version
+        for key in keys:
+            entry = cached.get(key)
+            if isinstance(entry, tuple) and entry[0] == version:
+                entries[key] = entry[1]
+    return versions, entries
+
+
+def get_user_cached_entries(user_id: int, keys) -> tuple:
+    """
+    Fetch the user's cache version and the given entries cached under it.
+    
+    Returns:
+        tuple of (version, valid values by key); store new entries for the
+        user as ``(version, value)`` pairs
+    """
+    version_key = f"user_cache_version_{user_id}"
+    versions, entries = get_versioned_entries({version_key: keys})
+    return versions[version_key], entries
+
+
 def invalidate_user_cache(user_id: int):
     """Invalidate all cache entries for a specific user."""
-    cache_keys = [
-        f"user_subscriptions_{user_id}",
-        f"active_subscription_{user_id}",
-    ]
-    cache.delete_many(cache_keys)
\ No newline at end of file
+    # The next read starts a new version, so every entry stamped with the
+    # dropped one is ignored
+    cache.delete(f"user_cache_version_{user_id}")
@@ -3,21 +3,20 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Prefetch
 from django.core.cache import cache
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
-from django.views.decorators.vary import vary_on_headers
 from django_ratelimit.decorators import ratelimit
 from django.db import models
 
-from .models import Subscription, Feature, Plan
+from .models import Subscription, Plan
 from .serializers import (
     SubscriptionCreateSerializer,
     SubscriptionUpdateSerializer,
     SubscriptionListSerializer,
     PlanSerializer,
 )
+from .utils import get_cache_key, get_user_cached_entries
 
 
 logger = logging.getLogger(__name__)
@@ -42,6 +41,23 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
 
+    # Columns read by SubscriptionListSerializer on read-only actions
+    list_only_fields = (
+        "id",
+        "user_id",
+        "plan_id",
+        "start_date",
+        "end_date",
+        "is_active",
+        "created_at",
+        "user__email",
+        "plan__name",
+        "plan__description",
+        "plan__price",
+        "plan__is_active",
+        "plan__created_at",
+    )
+
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
         if self.action == "create":
@@ -53,19 +69,18 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """
         Get optimized queryset for subscriptions.
-        Uses select_related and prefetch_related to avoid N+1 queries.
+        Uses select_related to avoid N+1 queries; plan features are served
+        from the per-plan feature cache by SubscriptionListSerializer.
+        Read-only actions only load the columns the list serializer needs.
         """
-        return (
+        queryset = (
             Subscription.objects.select_related("user", "plan")
-            .prefetch_related(
-                Prefetch(
-                    "plan__features",
-                    queryset=Feature.objects.filter(is_active=True).order_by("name"),
-                )
-            )
             .filter(user=self.request.user)
             .order_by("-start_date")
         )
+        if self.action in ["list", "retrieve", "active_subscription"]:
+            queryset = queryset.only(*self.list_only_fields)
+        return queryset
 
     @method_decorator(ratelimit(key="user", rate="10/min", method="POST"))
     def create(self, request, *args, **kwargs):
@@ -73,27 +88,52 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
         logger.info(f"Creating subscription for user {request.user.username}")
         return super().create(request, *args, **kwargs)
 
-    @method_decorator(cache_page(60 * 5))  # Cache for 5 minutes
-    @method_decorator(vary_on_headers("Authorization"))
     def list(self, request, *args, **kwargs):
-        """List user's subscriptions with caching."""
-        cache_key = f"user_subscriptions_{request.user.id}"
-        cached_data = cache.get(cache_key)
+        """List user's subscriptions with caching; ?summary=1 returns only the count."""
+        # One key per page, stamped with the user's cache version; query
+        # params the view does not use never reach the key
+        summary = request.query_params.get("summary") == "1"
+        if summary:
+            cache_key = self._list_cache_key(request.user.id, summary=True)
+        else:
+            cache_key = self._list_cache_key(
+                request.user.id,
+                page=request.query_params.get("page", "1"),
+                page_size=self.paginator.get_page_size(request),
+            )
+        active_cache_key = f"active_subscription_{request.user.id}"
+        version, cached = get_user_cached_entries(
+            request.user.id, [cache_key, active_cache_key]
+        )
 
-        if cached_data:
+        if cache_key in cached:
             logger.info(
                 f"Serving cached subscriptions for user {request.user.username}"
             )
-            return Response(cached_data)
+            return Response(cached[cache_key])
 
-        response = super().list(request, *args, **kwargs)
+        if summary:
+            # Count-only mode: skip pagination and nested serialization
+            response = Response(
+                {"count": self.filter_queryset(self.get_queryset()).count()}
+            )
+        else:
+            response = super().list(request, *args, **kwargs)
         if response.status_code == 200:
-            cache.set(cache_key, response.data, timeout=60 * 5)  # Cache for 5 minutes
+            cache_entries = {cache_key: (version, response.data)}
+
+            # Warm the active subscription entry from the listed page
+            if active_cache_key not in cached:
+                active_data = self._find_active_subscription(response.data)
+                if active_data is not None:
+                    cache_entries[active_cache_key] = (version, active_data)
+
+            cache.set_many(cache_entries, timeout=60 * 5)  # Cache for 5 minutes
 
         return response
 
-    @method_decorator(ratelimit(key="user", rate="5/min", method="PUT"))
     @action(detail=True, methods=["put"], url_path="change-plan")
+    @method_decorator(ratelimit(key="user", rate="5/min", method="PUT"))
     def change_plan(self, request, pk=None):
         """Change subscription plan with rate limiting."""
         subscription = self.get_object()
@@ -102,7 +142,9 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
         )
 
         if serializer.is_valid():
-            serializer.save()
+            # The saved instance already carries the new plan, and plan
+            # features come from the per-plan cache, so no re-fetch is needed
+            subscription = serializer.save()
             response_serializer = SubscriptionListSerializer(
                 subscription, context={"request": request}
             )
@@ -111,8 +153,8 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    @method_decorator(ratelimit(key="user", rate="10/min", method="POST"))
     @action(detail=True, methods=["post"], url_path="deactivate")
+    @method_decorator(ratelimit(key="user", rate="10/min", method="POST"))
     def deactivate(self, request, pk=None):
         """Deactivate a subscription."""
         subscription = self.get_object()
@@ -135,25 +177,60 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
     def active_subscription(self, request):
         """Get user's currently active subscription."""
         cache_key = f"active_subscription_{request.user.id}"
-        cached_data = cache.get(cache_key)
+        # The first page of the default listing usually holds the answer
+        first_page_key = self._list_cache_key(
+            request.user.id,
+            page="1",
+            page_size=self.paginator.page_size,
+        )
+        version, cached = get_user_cached_entries(
+            request.user.id, [cache_key, first_page_key]
+        )
+        cached_data = cached.get(cache_key)
 
-        if cached_data:
+        # False marks a cached "no active subscription" lookup
+        if cached_data is False:
+            return self._no_active_subscription_response()
+        if cached_data is not None:
             return Response(cached_data)
 
-        try:
-            subscription = self.get_queryset().get(is_active=True)
-            serializer = SubscriptionListSerializer(
-                subscription, context={"request": request}
-            )
-            cache.set(
-                cache_key, serializer.data, timeout=60 * 10
-            )  # Cache for 10 minutes
-            return Response(serializer.data)
-        except Subscription.DoesNotExist:
-            return Response(
-                {"message": "No active subscription found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+        # Serve from the cached first list page when it has the answer
+        if first_page_key in cached:
+            cached_data = self._find_active_subscription(cached[first_page_key])
+            if cached_data is not None:
+                cache.set(cache_key, (version, cached_data), timeout=60 * 10)
+                return Response(cached_data)
+
+        subscription = self.get_queryset().filter(is_active=True).first()
+        if subscription is None:
+            cache.set(cache_key, (version, False), timeout=60)  # Cache for 1 minute
+            return self._no_active_subscription_response()
+
+        serializer = SubscriptionListSerializer(
+            subscription, context={"request": request}
+        )
+        cache.set(
+            cache_key, (version, serializer.data), timeout=60 * 10
+        )  # Cache for 10 minutes
+        return Response(serializer.data)
+
+    def _list_cache_key(self, user_id, **params):
+        """Build the cache key of one list page (or summary) for a user."""
+        return get_cache_key(f"user_subscriptions_{user_id}", **params)
+
+    def _find_active_subscription(self, page_data):
+        """Return the active subscription from serialized list page data, if any."""
+        for subscription_data in page_data.get("results", []):
+            if subscription_data["is_active"]:
+                return subscription_data
+        return None
+
+    def _no_active_subscription_response(self):
+        """Return the 404 response for users without an active subscription."""
+        return Response(
+            {"message": "No active subscription found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
 
 
 class PlanViewSet(viewsets.ReadOnlyModelViewSet):